@@ -4,6 +4,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 
 DATA_DIR = os.path.join(BASE_DIR, "data")
 RAW_DIR = os.path.join(DATA_DIR, "raw")
+RAW_ECOMMERCE_DIR = os.path.join(RAW_DIR, "e-commerce_projeto_est")
 PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
 
 OUTPUTS_DIR = os.path.join(BASE_DIR, "outputs")
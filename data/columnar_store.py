@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from config.paths import PROCESSED_DIR
+from data.load_data import load_csv
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Armazenamento colunar: um .npy por coluna + manifest.json
+# - numéricas: array de largura fixa
+# - datas: int64 (ns desde epoch, NaT = int64 mínimo)
+# - texto: códigos inteiros (dicionário de categorias no manifest)
+# Leitura com mmap_mode='r': colunas são views do arquivo, compartilhadas entre
+# processos pelo page cache, e só as páginas efetivamente acessadas ficam residentes.
+#
+# Publicação: cada escrita gera um diretório de versão único (v<ns>-*) e só então
+# troca atomicamente o ponteiro CURRENT (os.replace). Leitores sempre veem uma versão
+# completa; as reconstruções são serializadas por um lock de arquivo. A limpeza pode
+# remover a versão de um leitor ainda abrindo os arquivos: open_columns então relê o ponteiro.
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+LOCK = ".lock"
+KEEP_VERSIONS = 2  # a versão anterior é mantida para leitores que já leram o ponteiro
+OPEN_RETRIES = 10
+DATE_COLS = ['order_date', 'delivery_forecast', 'delivery_date']
+
+
+def columnar_dir(name="vw_gold_orders"):
+    """Diretório do armazenamento colunar de uma tabela processada."""
+    return os.path.join(PROCESSED_DIR, name, "columns")
+
+
+@contextmanager
+def _rebuild_lock(root):
+    """Lock exclusivo (entre processos) para escrita/limpeza das versões."""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, LOCK), 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def current_version_dir(name="vw_gold_orders"):
+    """Diretório da versão publicada (apontada por CURRENT) ou None."""
+    root = columnar_dir(name)
+    try:
+        with open(os.path.join(root, CURRENT), encoding='utf-8') as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(root, version) if version else None
+
+
+def _write_version(df, root):
+    """Grava as colunas em um diretório de versão novo e publica o ponteiro. Exige o lock."""
+    version_dir = tempfile.mkdtemp(prefix=f"v{time.time_ns()}-", dir=root)
+    try:
+        manifest = {'n_rows': len(df), 'columns': {}}
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            filename = f"{i:03d}.npy"
+
+            if pd.api.types.is_datetime64_any_dtype(series):
+                values = series.dt.tz_localize(None) if series.dt.tz is not None else series
+                np.save(os.path.join(version_dir, filename), values.to_numpy('datetime64[ns]').view(np.int64))
+                info = {'kind': 'datetime'}
+            elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+                values = series.to_numpy()
+                if values.dtype == object:
+                    values = pd.to_numeric(series, errors='coerce').to_numpy(float)
+                np.save(os.path.join(version_dir, filename), values)
+                info = {'kind': 'numeric'}
+            else:
+                codes, categories = pd.factorize(series, sort=True)
+                # Mesmo dtype de códigos usado pelo pandas, para from_codes não copiar
+                dtype = pd.Categorical.from_codes([], categories=categories).codes.dtype
+                np.save(os.path.join(version_dir, filename), codes.astype(dtype))
+                info = {'kind': 'category', 'categories': [str(c) for c in categories]}
+
+            info['file'] = filename
+            manifest['columns'][col] = info
+
+        with open(os.path.join(version_dir, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+
+    # Publicação atômica: o ponteiro só muda depois da versão completa em disco
+    fd, tmp_pointer = tempfile.mkstemp(prefix=".current-", dir=root)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(os.path.basename(version_dir))
+    os.replace(tmp_pointer, os.path.join(root, CURRENT))
+
+    # Remove versões antigas (e restos de escritas interrompidas)
+    versions = sorted(d for d in os.listdir(root) if d.startswith('v') and os.path.isdir(os.path.join(root, d)))
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+    return version_dir
+
+
+def write_columnar(df, name="vw_gold_orders"):
+    """
+    Persiste o DataFrame em formato colunar (um .npy por coluna) como nova versão.
+    Leitores nunca veem uma versão parcial: o ponteiro CURRENT é trocado
+    atomicamente ao final, e escritores concorrentes são serializados por lock.
+    Retorna o diretório da versão publicada.
+    """
+    root = columnar_dir(name)
+    with _rebuild_lock(root):
+        return _write_version(df, root)
+
+
+def _open_version(path, columns):
+    """Abre as colunas de um diretório de versão (FileNotFoundError se ele sumir)."""
+    with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if columns is None:
+        columns = list(manifest['columns'])
+    missing = [c for c in columns if c not in manifest['columns']]
+    if missing:
+        raise KeyError(f"Colunas não encontradas: {missing}")
+
+    arrays = {}
+    for col in columns:
+        info = manifest['columns'][col]
+        values = np.load(os.path.join(path, info['file']), mmap_mode='r')
+        if info['kind'] == 'datetime':
+            values = values.view('datetime64[ns]')
+        elif info['kind'] == 'category':
+            values = pd.Categorical.from_codes(
+                values, dtype=pd.CategoricalDtype(info['categories']), validate=False
+            )
+        arrays[col] = values
+
+    return arrays
+
+
+def open_columns(name="vw_gold_orders", columns=None):
+    """
+    Abre as colunas em modo memory-mapped e retorna {coluna: array}.
+    Texto volta como pd.Categorical sobre os códigos mapeados (sem cópia).
+    Se a versão lida for removida por publicações concorrentes antes de todos
+    os arquivos estarem mapeados, o ponteiro CURRENT é relido (até OPEN_RETRIES vezes).
+    Arquivos já mapeados continuam válidos mesmo após a remoção.
+    """
+    for attempt in range(OPEN_RETRIES):
+        path = current_version_dir(name)
+        if path is None:
+            raise FileNotFoundError(f"Armazenamento colunar não encontrado: {columnar_dir(name)}")
+        try:
+            return _open_version(path, columns)
+        except FileNotFoundError:
+            if attempt == OPEN_RETRIES - 1:
+                raise
+            time.sleep(0.001 * (attempt + 1))
+
+
+def read_columnar(name="vw_gold_orders", columns=None):
+    """
+    Monta um DataFrame cujas colunas são views dos arquivos mapeados em memória.
+    columns: lista opcional; só as colunas pedidas são abertas.
+    """
+    return pd.DataFrame(open_columns(name, columns), copy=False)
+
+
+def _is_stale(name, csv_path):
+    """True se não há versão publicada ou se o CSV (quando existe) é mais novo."""
+    version_dir = current_version_dir(name)
+    if version_dir is None:
+        return True
+    manifest_path = os.path.join(version_dir, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return True
+    if not os.path.exists(csv_path):
+        return False
+    return os.path.getmtime(manifest_path) < os.path.getmtime(csv_path)
+
+
+def load_orders(columns=None, name="vw_gold_orders"):
+    """
+    Carrega vw_gold_orders a partir do armazenamento colunar, (re)gerando-o
+    a partir do CSV quando ausente ou mais antigo que o CSV.
+    Sem o CSV, usa o armazenamento existente; erro só se nenhum dos dois existir.
+    """
+    csv_path = os.path.join(PROCESSED_DIR, name, f"{name}.csv")
+
+    if _is_stale(name, csv_path):
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"Nem armazenamento colunar nem CSV encontrados: {csv_path}")
+        root = columnar_dir(name)
+        with _rebuild_lock(root):
+            # Outro processo pode ter reconstruído enquanto esperávamos o lock
+            if _is_stale(name, csv_path):
+                df = load_csv(f"{name}/{name}.csv")
+                for col in DATE_COLS:
+                    if col in df.columns:
+                        df[col] = pd.to_datetime(df[col], errors='coerce')
+                _write_version(df, root)
+
+    return read_columnar(name, columns)
@@ -0,0 +1,170 @@
+import time
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from data.load_data import load_raw_csv
+
+# Dimensões usadas no enriquecimento: arquivo bruto -> {coluna origem: coluna destino}.
+# Assim como dim_delivery na view gold, as dimensões se ligam ao pedido pelo Id (= order_id).
+DIMENSIONS = {
+    'customer': ('DIM_Customer.csv', {'City': 'city', 'State': 'state', 'Region': 'region'}),
+    'shopping': ('DIM_Shopping.csv', {'Quantity': 'quantity'}),
+}
+
+GEO_COLS = ['state', 'region', 'city']
+
+# Usa tabela densa de posições se max(chave) <= fator * nº de chaves (+ folga)
+DENSE_MAX_FACTOR = 4
+
+
+def build_dimension_index(dim_df, columns, key_col='Id'):
+    """
+    Monta um índice compacto de uma dimensão:
+    - keys: array int64 ordenado com as chaves
+    - positions: tabela densa chave -> posição (-1 se ausente), quando as
+      chaves são inteiros compactos; senão None e a busca usa searchsorted
+    - columns: {destino: (códigos int32, categorias)} para texto
+               ou {destino: (valores, None)} para numéricos
+    Colunas de texto são codificadas por dicionário (pd.factorize).
+    Chaves duplicadas mantêm a primeira linha (com aviso).
+    """
+    keys = pd.to_numeric(dim_df[key_col], errors='coerce').to_numpy()
+    valid = ~np.isnan(keys)
+    keys = keys[valid].astype(np.int64)
+    order = np.argsort(keys, kind='stable')
+
+    # Chaves duplicadas: mantém a primeira linha (ordenação estável) em ambos os caminhos
+    sorted_keys = keys[order]
+    first = np.ones(len(sorted_keys), dtype=bool)
+    first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    if not first.all():
+        print(f"⚠️ {int((~first).sum())} chaves duplicadas em {key_col}; mantida a primeira ocorrência")
+    order = order[first]
+    keys = sorted_keys[first]
+
+    positions = None
+    if len(keys) and keys[0] >= 0 and keys[-1] <= DENSE_MAX_FACTOR * len(keys) + 1024:
+        positions = np.full(keys[-1] + 1, -1, dtype=np.int64)
+        positions[keys] = np.arange(len(keys))
+
+    index = {'keys': keys, 'positions': positions, 'columns': {}}
+    for src, dst in columns.items():
+        values = dim_df[src].to_numpy()[valid][order]
+        if pd.api.types.is_numeric_dtype(dim_df[src]):
+            index['columns'][dst] = (values.astype(float), None)
+        else:
+            codes, categories = pd.factorize(values, sort=True)
+            index['columns'][dst] = (codes.astype(np.int32), categories)
+
+    return index
+
+
+@lru_cache(maxsize=None)
+def load_dimension_indexes():
+    """
+    Lê as dimensões uma única vez e devolve {nome: índice}.
+    O resultado fica em cache para as chamadas seguintes.
+    """
+    indexes = {}
+    for name, (filename, columns) in DIMENSIONS.items():
+        dim_df = load_raw_csv(filename, usecols=['Id'] + list(columns))
+        indexes[name] = build_dimension_index(dim_df, columns)
+    return indexes
+
+
+def gather(index, keys):
+    """
+    Busca vetorizada das chaves no índice (tabela densa ou searchsorted).
+    Retorna {coluna: Series} alinhado a `keys`; chaves ausentes viram NaN.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    dim_keys = index['keys']
+
+    if len(dim_keys) == 0:
+        return {
+            col: np.full(len(keys), np.nan) if categories is None
+            else pd.Categorical.from_codes(np.full(len(keys), -1), categories)
+            for col, (values, categories) in index['columns'].items()
+        }
+
+    positions = index['positions']
+    if positions is not None:
+        in_range = (keys >= 0) & (keys < len(positions))
+        pos = positions[np.where(in_range, keys, 0)]
+        found = in_range & (pos >= 0)
+    else:
+        pos = np.minimum(np.searchsorted(dim_keys, keys), len(dim_keys) - 1)
+        found = dim_keys[pos] == keys
+
+    result = {}
+    for col, (values, categories) in index['columns'].items():
+        if categories is None:
+            result[col] = np.where(found, values[pos], np.nan)
+        else:
+            codes = np.where(found, values[pos], -1)
+            result[col] = pd.Categorical.from_codes(
+                codes, dtype=pd.CategoricalDtype(categories), validate=False
+            )
+    return result
+
+
+def enrich_orders(df, indexes=None, key_col='order_id'):
+    """
+    Anexa à base de pedidos as colunas das dimensões:
+    - state, region, city (DIM_Customer) como categóricas
+    - quantity (DIM_Shopping)
+    Colunas já existentes não são sobrescritas.
+    """
+    if key_col not in df.columns:
+        print(f"⚠️ Coluna {key_col} ausente, enriquecimento ignorado")
+        return df
+
+    if indexes is None:
+        indexes = load_dimension_indexes()
+
+    keys = pd.to_numeric(df[key_col], errors='coerce').fillna(-1).to_numpy(np.int64)
+
+    for name, index in indexes.items():
+        pending = [c for c in index['columns'] if c not in df.columns]
+        if not pending:
+            continue
+        for col, values in gather(index, keys).items():
+            if col in pending:
+                df[col] = values
+
+    return df
+
+
+def benchmark_enrichment(n_rows=1_000_000, repeats=3, seed=42):
+    """
+    Compara o custo do gather por índice com um pd.merge equivalente
+    em uma base sintética de n_rows pedidos. Retorna um DataFrame com os tempos (s).
+    """
+    indexes = load_dimension_indexes()
+    filename, columns = DIMENSIONS['customer']
+    dim_df = load_raw_csv(filename, usecols=['Id'] + list(columns))
+
+    rng = np.random.default_rng(seed)
+    orders = pd.DataFrame({'order_id': rng.integers(1, len(dim_df) + 1, n_rows)})
+
+    def run_gather():
+        enrich_orders(orders[['order_id']].copy(), {'customer': indexes['customer']})
+
+    def run_merge():
+        orders.merge(dim_df.rename(columns=columns), how='left', left_on='order_id', right_on='Id')
+
+    rows = []
+    for method, fn in [('gather', run_gather), ('merge', run_merge)]:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        rows.append({'method': method, 'n_rows': n_rows, 'best_s': min(timings), 'mean_s': np.mean(timings)})
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    for n in [10_000, 100_000, 1_000_000]:
+        print(benchmark_enrichment(n))
@@ -1,5 +1,5 @@
 import pandas as pd
-from config.paths import PROCESSED_DIR
+from config.paths import PROCESSED_DIR, RAW_ECOMMERCE_DIR
 import os
 
 def load_csv(path="vw_gold_orders/vw_gold_orders.csv"):
@@ -12,3 +12,16 @@ def load_csv(path="vw_gold_orders/vw_gold_orders.csv"):
         raise FileNotFoundError(f"Arquivo não encontrado: {csv_path}")
     
     return pd.read_csv(csv_path)
+
+
+def load_raw_csv(filename, usecols=None):
+    """
+    Carrega um CSV bruto (ex.: DIM_Customer.csv) da pasta raw do e-commerce.
+    usecols: lista opcional de colunas para ler apenas o necessário.
+    """
+    csv_path = os.path.join(RAW_ECOMMERCE_DIR, filename)
+
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {csv_path}")
+
+    return pd.read_csv(csv_path, usecols=usecols)
@@ -0,0 +1,214 @@
+import os
+import re
+import json
+import time
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from config.paths import PROCESSED_DIR, TABLES_DIR
+from data.load_data import load_raw_csv
+
+QUARANTINE_DIR = os.path.join(PROCESSED_DIR, "quarantine")
+
+# Regras declarativas de qualidade da vw_gold_orders.
+# severity='error' coloca a linha em quarentena; 'warn' apenas contabiliza no relatório.
+# Valores nulos só são cobrados pela regra not_null (as demais ignoram NaN/NaT).
+RULES = [
+    {'name': 'campos_obrigatorios', 'check': 'not_null',
+     'columns': ['order_id', 'order_date', 'product_id', 'subtotal', 'total',
+                 'delivery_id', 'category', 'subcategory', 'product_price']},
+    {'name': 'order_id_unico', 'check': 'unique', 'column': 'order_id'},
+    {'name': 'discount_entre_0_e_1', 'check': 'range', 'column': 'discount', 'min': 0, 'max': 1},
+    {'name': 'subtotal_nao_negativo', 'check': 'range', 'column': 'subtotal', 'min': 0},
+    {'name': 'total_nao_negativo', 'check': 'range', 'column': 'total', 'min': 0},
+    {'name': 'frete_nao_negativo', 'check': 'range', 'column': 'freight_price', 'min': 0},
+    {'name': 'preco_produto_positivo', 'check': 'range', 'column': 'product_price', 'min': 0.01},
+    {'name': 'produto_em_dim_products', 'check': 'in_dimension', 'column': 'product_id',
+     'dimension': ('DIM_Products.csv', 'Product_Id')},
+    {'name': 'entrega_em_dim_delivery', 'check': 'in_dimension', 'column': 'delivery_id',
+     'dimension': ('DIM_Delivery.csv', 'Delivery_Id')},
+    {'name': 'pedido_em_dim_customer', 'check': 'in_dimension', 'column': 'order_id',
+     'dimension': ('DIM_Customer.csv', 'Id')},
+    # A view gold já trunca lead time negativo em 0 (GREATEST), então só reporta
+    {'name': 'entrega_apos_pedido', 'check': 'compare', 'left': 'delivery_date', 'op': '>=',
+     'right': 'order_date', 'severity': 'warn'},
+    {'name': 'total_consistente', 'check': 'approx', 'column': 'total',
+     'expr': 'subtotal * (1 - discount) + freight_price', 'tolerance': 0.011},
+    {'name': 'discount_abs_consistente', 'check': 'approx', 'column': 'discount_abs',
+     'expr': 'discount * subtotal', 'tolerance': 0.011},
+]
+
+COMPARE_OPS = {'>=': np.greater_equal, '>': np.greater, '<=': np.less_equal,
+               '<': np.less, '==': np.equal}
+
+
+@lru_cache(maxsize=None)
+def dimension_keys(filename, key_col):
+    """Chaves de uma dimensão (lidas uma única vez)."""
+    return load_raw_csv(filename, usecols=[key_col])[key_col].dropna().unique()
+
+
+def _numeric(df, col):
+    return pd.to_numeric(df[col], errors='coerce').to_numpy(float)
+
+
+def _as_datetime(df, col):
+    series = df[col]
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series, errors='coerce')
+    return series.to_numpy('datetime64[ns]')
+
+
+def check_not_null(df, rule):
+    return df[rule['columns']].isna().to_numpy().any(axis=1)
+
+
+def check_unique(df, rule):
+    return df[rule['column']].duplicated(keep='first').to_numpy()
+
+
+def check_range(df, rule):
+    values = _numeric(df, rule['column'])
+    fails = np.zeros(len(values), dtype=bool)
+    if 'min' in rule:
+        fails |= values < rule['min']
+    if 'max' in rule:
+        fails |= values > rule['max']
+    return fails
+
+
+def check_in_dimension(df, rule):
+    series = df[rule['column']]
+    return (~series.isin(dimension_keys(*rule['dimension'])) & series.notna()).to_numpy()
+
+
+def check_compare(df, rule):
+    if pd.api.types.is_numeric_dtype(df[rule['left']]):
+        left, right = _numeric(df, rule['left']), _numeric(df, rule['right'])
+        valid = ~(np.isnan(left) | np.isnan(right))
+    else:
+        left, right = _as_datetime(df, rule['left']), _as_datetime(df, rule['right'])
+        valid = ~(np.isnat(left) | np.isnat(right))
+    return valid & ~COMPARE_OPS[rule['op']](left, right)
+
+
+def expr_columns(expr):
+    """Identificadores (nomes de coluna) usados em uma expressão de regra."""
+    return sorted(set(re.findall(r'[A-Za-z_]\w*', expr)))
+
+
+def check_approx(df, rule):
+    columns = {c: _numeric(df, c) for c in expr_columns(rule['expr'])}
+    expected = pd.eval(rule['expr'], local_dict=columns, engine='python')
+    diff = np.abs(_numeric(df, rule['column']) - np.asarray(expected, dtype=float))
+    return diff > rule['tolerance']
+
+
+CHECKS = {
+    'not_null': check_not_null,
+    'unique': check_unique,
+    'range': check_range,
+    'in_dimension': check_in_dimension,
+    'compare': check_compare,
+    'approx': check_approx,
+}
+
+
+def validate(df, rules=None):
+    """
+    Avalia todas as regras em uma passada vetorizada.
+    Retorna (matriz de falhas n_linhas x n_regras, regras avaliadas).
+    Regras cujas colunas não existem no DataFrame são ignoradas com aviso.
+    """
+    if rules is None:
+        rules = RULES
+
+    applied, masks = [], []
+    for rule in rules:
+        if rule['check'] not in CHECKS:
+            raise ValueError(f"Tipo de regra desconhecido: {rule['check']}")
+        needed = rule.get('columns') or [rule.get('column'), rule.get('left'), rule.get('right')]
+        if 'expr' in rule:
+            needed = list(needed) + expr_columns(rule['expr'])
+        missing = [c for c in needed if c is not None and c not in df.columns]
+        if missing:
+            print(f"⚠️ Regra {rule['name']} ignorada: colunas ausentes {missing}")
+            continue
+        applied.append(rule)
+        masks.append(CHECKS[rule['check']](df, rule))
+
+    fails = np.column_stack(masks) if masks else np.zeros((len(df), 0), dtype=bool)
+    return fails, applied
+
+
+def run_quality_stage(df, rules=None, max_quarantine_pct=1.0, save=True, name="vw_gold_orders",
+                      keep_columns=None):
+    """
+    Etapa de qualidade de dados:
+    - avalia as regras (validate)
+    - separa em quarentena as linhas que falham regras de severidade 'error'
+    - gera relatório compacto (JSON) com falhas por regra
+    passed=False quando a quarentena excede max_quarantine_pct (%).
+    Retorna (DataFrame limpo, relatório).
+
+    Sem quarentena o DataFrame original é devolvido sem cópia. Com alguma linha
+    em quarentena, o filtro booleano copia para a memória do processo todas as
+    colunas (inclusive as memory-mapped de columnar_store); keep_columns limita
+    essa cópia às colunas que as etapas seguintes realmente usam.
+    """
+    start = time.perf_counter()
+    fails, applied = validate(df, rules)
+
+    is_error = np.array([r.get('severity', 'error') == 'error' for r in applied], dtype=bool)
+    quarantined = fails[:, is_error].any(axis=1)
+    n_rows, n_quarantined = len(df), int(quarantined.sum())
+    pct_quarantined = 100 * n_quarantined / n_rows if n_rows else 0.0
+
+    failed_counts = fails.sum(axis=0)
+    report = {
+        'table': name,
+        'n_rows': n_rows,
+        'n_quarantined': n_quarantined,
+        'pct_quarantined': pct_quarantined,
+        'max_quarantine_pct': max_quarantine_pct,
+        'passed': pct_quarantined <= max_quarantine_pct,
+        'rules': [
+            {
+                'name': rule['name'],
+                'check': rule['check'],
+                'severity': rule.get('severity', 'error'),
+                'failed': int(failed_counts[i]),
+                'pct_failed': 100 * failed_counts[i] / n_rows if n_rows else 0.0,
+            }
+            for i, rule in enumerate(applied)
+        ],
+    }
+
+    clean = df if keep_columns is None else df[keep_columns]
+    if n_quarantined:
+        clean = clean[~quarantined]
+    report['elapsed_s'] = time.perf_counter() - start
+
+    if save:
+        with open(os.path.join(TABLES_DIR, "data_quality_report.json"), 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        os.makedirs(QUARANTINE_DIR, exist_ok=True)
+        rows = df[quarantined].copy()
+        names = np.array([r['name'] for r in applied], dtype=object)
+        rows['failed_rules'] = [';'.join(names[row]) for row in fails[quarantined]]
+        rows.to_csv(os.path.join(QUARANTINE_DIR, f"{name}.csv"), index=False)
+
+    return clean, report
+
+
+def print_quality_report(report):
+    """Resumo legível do relatório de qualidade."""
+    print("\n===== Qualidade de Dados =====")
+    for rule in report['rules']:
+        status = "✅" if rule['failed'] == 0 else ("⚠️" if rule['severity'] == 'warn' else "❌")
+        print(f"{status} {rule['name']}: {rule['failed']} falhas ({rule['pct_failed']:.2f}%)")
+    print(f"Linhas em quarentena: {report['n_quarantined']} de {report['n_rows']} "
+          f"({report['pct_quarantined']:.2f}%)")
+    if not report['passed']:
+        print(f"⚠️ Quarentena acima do limite de {report['max_quarantine_pct']:.2f}%")
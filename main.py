@@ -1,10 +1,12 @@
 import os
-from data.load_data import load_csv
+import sys
+from data.columnar_store import load_orders
 from data.feature_engineering import apply_feature_engineering
+from data.enrichment import enrich_orders
 
 from notebooks.histograms_boxplots import plot_histograms_and_boxplots
 from notebooks.correlations import plot_correlation
-from notebooks.time_series import analyze_time_series
+from notebooks.time_series import analyze_time_series, analyze_time_series_by_group
 from notebooks.kpis import compute_kpis
 from notebooks.kpis_plot import plot_kpis
 
@@ -12,28 +14,38 @@ from notebooks.kpis_plot import plot_kpis
 from stats.inference import compute_indicators_ci
 from stats.normality import check_and_plot_normality
 from stats.independence_tests import test_autocorrelation
+from stats.elasticity import compute_elasticities
 
-# Função de inspeção
-from notebooks.inspection import inspect_dataset
+# Qualidade de dados
+from data.quality import run_quality_stage, print_quality_report
 
 
 def main():
 
-    # 1. Carregar dados
-    df = load_csv()
+    # 1. Carregar dados (colunar memory-mapped, gerado a partir do CSV se necessário)
+    df = load_orders()
 
-    # 1.1 Inspecionar dataset
-    inspect_dataset(df)
+    # 1.1 Qualidade de dados (linhas inválidas vão para quarentena)
+    df, quality_report = run_quality_stage(df)
+    print_quality_report(quality_report)
+    if not quality_report['passed']:
+        print("❌ Pipeline interrompido: dados reprovados na etapa de qualidade.")
+        sys.exit(1)
 
     # 2. Feature Engineering
     df = apply_feature_engineering(df)
 
+    # 2.1 Enriquecimento com dimensões (UF, região, cidade, quantidade)
+    df = enrich_orders(df)
+
     # 3. EDA
     plot_histograms_and_boxplots(df)
     plot_correlation(df)
 
     # 4. Séries temporais
     monthly_summary = analyze_time_series(df)
+    for col in ['region', 'state']:
+        analyze_time_series_by_group(df, col)
 
     # 5. Indicadores com IC
     compute_indicators_ci(df)
@@ -50,6 +62,10 @@ def main():
     kpis = compute_kpis(df)
     plot_kpis(kpis)
 
+    # 9. Elasticidade volume/receita x desconto por Category/Subcategory
+    compute_elasticities(df)
+    compute_elasticities(df, by_month=True)
+
     print("\nPipeline concluído.")
 
 
@@ -11,7 +11,8 @@ def plot_correlation(df):
         'is_confirmed','freight_share','product_price'
     ]
 
-    df_corr = df[cols].apply(lambda x: x.astype(float)).dropna()
+    # Uma única cópia float das colunas usadas (não duplica o DataFrame inteiro)
+    df_corr = df[cols].astype(float).dropna()
 
     corr = df_corr.corr()
 
@@ -2,9 +2,16 @@ import os
 import pandas as pd
 from config.paths import TABLES_DIR
 
-def compute_kpis(df):
+GROUP_COLS = ['category','subcategory','delivery_service','state','region']
 
-    group_cols = ['category','subcategory','delivery_service']
+def compute_kpis(df, group_cols=None):
+    """
+    Calcula KPIs agregados por cada coluna de agrupamento e salva em CSV.
+    group_cols: padrão GROUP_COLS (state/region exigem enrich_orders antes).
+    Retorna dict {group_col: csv_path}.
+    """
+    if group_cols is None:
+        group_cols = GROUP_COLS
 
     result_paths = {}
 
@@ -13,7 +20,7 @@ def compute_kpis(df):
             print(f"⚠️ Coluna {col} ausente")
             continue
 
-        kpi = df.groupby(col).agg(
+        kpi = df.groupby(col, observed=True).agg(
             total_orders=('order_id','count'),
             total_revenue=('product_price','sum'),
             avg_ticket=('product_price','mean'),
@@ -1,7 +1,7 @@
 import os
 import matplotlib.pyplot as plt
 import seaborn as sns
-from config.paths import FIGURES_DIR
+from config.paths import FIGURES_DIR, TABLES_DIR
 
 sns.set(style="whitegrid")
 sns.set_context("talk")
@@ -22,6 +22,7 @@ def analyze_time_series(df):
     
     # Converter year_month de Period -> datetime
     monthly_summary['year_month'] = monthly_summary['year_month'].dt.to_timestamp()
+    monthly_summary.to_csv(os.path.join(TABLES_DIR, "series_mensais.csv"), index=False)
     
     # ==== Correlação mensal ====
     corr_cols = ['revenue', 'orders', 'freight']
@@ -45,9 +46,8 @@ def analyze_time_series(df):
     plt.close()
     
     # ==== 2. Séries temporais normalizadas ====
-    monthly_norm = monthly_summary.copy()
-    for col in corr_cols:
-        monthly_norm[col] = (monthly_summary[col] - monthly_summary[col].mean()) / monthly_summary[col].std()
+    values = monthly_summary[corr_cols]
+    monthly_norm = ((values - values.mean()) / values.std()).assign(year_month=monthly_summary['year_month'])
     
     plt.figure(figsize=(15, 6))
     sns.lineplot(data=monthly_norm, x='year_month', y='revenue', marker='o', label='Receita (normalizada)')
@@ -63,13 +63,12 @@ def analyze_time_series(df):
     plt.close()
     
     # ==== 3. Séries mensais com IC (usando erro padrão como proxy) ====
-    monthly_ci = monthly_summary.copy()
-    monthly_ci['revenue_lower'] = monthly_ci['revenue'] - monthly_ci['revenue'].std() / (len(df)**0.5)
-    monthly_ci['revenue_upper'] = monthly_ci['revenue'] + monthly_ci['revenue'].std() / (len(df)**0.5)
+    revenue = monthly_summary['revenue']
+    revenue_margin = revenue.std() / (len(df)**0.5)
     
     plt.figure(figsize=(15, 6))
-    plt.plot(monthly_ci['year_month'], monthly_ci['revenue'], marker='o', label='Receita')
-    plt.fill_between(monthly_ci['year_month'], monthly_ci['revenue_lower'], monthly_ci['revenue_upper'], color='blue', alpha=0.2, label='IC aproximado')
+    plt.plot(monthly_summary['year_month'], revenue, marker='o', label='Receita')
+    plt.fill_between(monthly_summary['year_month'], revenue - revenue_margin, revenue + revenue_margin, color='blue', alpha=0.2, label='IC aproximado')
     plt.title('Séries Temporais Mensais com IC')
     plt.xlabel('Mês')
     plt.ylabel('Receita')
@@ -94,8 +93,7 @@ def analyze_time_series(df):
     plt.close()
     
     # ==== 5. Variação percentual mensal ====
-    monthly_pct = monthly_summary.copy()
-    monthly_pct[corr_cols] = monthly_pct[corr_cols].pct_change() * 100
+    monthly_pct = (monthly_summary[corr_cols].pct_change() * 100).assign(year_month=monthly_summary['year_month'])
     plt.figure(figsize=(15, 6))
     for col in corr_cols:
         sns.lineplot(data=monthly_pct, x='year_month', y=col, marker='o', label=f'{col} (%)')
@@ -108,4 +106,39 @@ def analyze_time_series(df):
     plt.savefig(os.path.join(FIGURES_DIR, "series_temporais_variacao_percentual.png"))
     plt.close()
     
-    return monthly_summary
\ No newline at end of file
+    return monthly_summary
+
+
+def analyze_time_series_by_group(df, group_col='region'):
+    """
+    Agrega revenue, freight e orders por mês e por group_col (ex.: region, state),
+    salva a tabela em TABLES_DIR e plota a receita mensal de cada grupo.
+    Retorna o DataFrame mensal por grupo.
+    """
+    if group_col not in df.columns:
+        print(f"⚠️ Coluna {group_col} ausente")
+        return None
+
+    year_month = df['order_date'].dt.to_period('M').rename('year_month')
+
+    monthly_group = df.groupby([year_month, group_col], observed=True).agg(
+        revenue=('product_price', 'sum'),
+        freight=('freight_price', 'sum'),
+        orders=('order_id', 'count')
+    ).reset_index()
+    monthly_group['year_month'] = monthly_group['year_month'].dt.to_timestamp()
+
+    monthly_group.to_csv(os.path.join(TABLES_DIR, f"series_mensais_{group_col}.csv"), index=False)
+
+    plt.figure(figsize=(15, 6))
+    sns.lineplot(data=monthly_group, x='year_month', y='revenue', hue=group_col, marker='o')
+    plt.title(f'Receita Mensal por {group_col}')
+    plt.xlabel('Mês')
+    plt.ylabel('Receita')
+    plt.xticks(rotation=45)
+    plt.legend(title=group_col, fontsize=10)
+    plt.tight_layout()
+    plt.savefig(os.path.join(FIGURES_DIR, f"series_temporais_receita_{group_col}.png"))
+    plt.close()
+
+    return monthly_group
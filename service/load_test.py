@@ -0,0 +1,157 @@
+import json
+import time
+import itertools
+import asyncio
+import argparse
+import numpy as np
+from config.paths import TABLES_DIR
+from service.query_service import QueryStore, QueryServer
+
+
+async def fetch(reader, writer, target, host):
+    """Envia um GET com keep-alive e retorna (status, corpo em bytes)."""
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        if key.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+def build_targets(tables):
+    """
+    Monta um conjunto de consultas representativas a partir de /tables:
+    leitura completa, filtro pelo primeiro valor, group-by e intervalo de tempo.
+    """
+    targets = []
+    for name, info in tables.items():
+        cols = info['columns']
+        targets.append(f"/query?table={name}")
+        if name.startswith('kpis_'):
+            targets.append(f"/query?table={name}&columns={cols[0]},total_revenue&limit=5")
+        if 'year_month' in cols:
+            targets.append(f"/query?table={name}&start=2025-03-01&end=2025-06-01")
+            group_cols = [c for c in cols if c in ('region', 'state')]
+            if group_cols:
+                targets.append(f"/query?table={name}&group_by={group_cols[0]}&agg=revenue:sum,orders:sum")
+    return targets
+
+
+# Limite muito acima do tamanho das tabelas: não altera o resultado, mas torna
+# cada URL única, forçando o servidor a executar a consulta (sem cache)
+UNCACHED_LIMIT = 10**9
+
+PHASES = ['cached', 'uncached']
+
+
+async def worker(host, port, targets, deadline, latencies, errors, offset, unique_ids=None):
+    """
+    Envia consultas em loop até `deadline`.
+    unique_ids: itertools.count compartilhado; se informado, cada requisição
+    recebe um limit distinto para nunca ser atendida pelo cache do servidor.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            target = targets[i % len(targets)]
+            if unique_ids is not None:
+                target += f"&limit={UNCACHED_LIMIT + next(unique_ids)}"
+            start = time.perf_counter()
+            status, _ = await fetch(reader, writer, target, host)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors.append(target)
+            i += 1
+    finally:
+        writer.close()
+
+
+async def run_phase(host, port, targets, concurrency, duration, uncached):
+    """Executa uma fase do teste e retorna throughput e percentis de latência (ms)."""
+    latencies, errors = [], []
+    unique_ids = itertools.count() if uncached else None
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*[
+        worker(host, port, targets, deadline, latencies, errors, k, unique_ids)
+        for k in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    lat = np.array(latencies)
+    p50, p90, p99 = np.percentile(lat, [50, 90, 99])
+    return {
+        'requests': len(lat),
+        'errors': len(errors),
+        'throughput_rps': len(lat) / elapsed,
+        'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99, 'max_ms': lat.max(),
+    }
+
+
+async def run_load_test(host='127.0.0.1', port=8765, concurrency=8, duration=10.0,
+                        spawn=False, cache=True, phases=PHASES):
+    """
+    Dispara consultas com `concurrency` conexões durante `duration` segundos por fase:
+    - cached: conjunto fixo de URLs (após a primeira passada, respostas vêm do cache)
+    - uncached: cada URL é única, medindo a execução real das consultas
+    spawn=True sobe uma instância local no mesmo processo (cache=False desliga o cache dela).
+    Retorna {fase: dict com throughput (req/s) e percentis de latência (ms)}.
+    """
+    server = None
+    if spawn:
+        store = QueryStore(TABLES_DIR)
+        cache_size = 1024 if cache else 0
+        server = await QueryServer(store, reload_interval=0, cache_size=cache_size).start(host, port)
+
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        _, body = await fetch(reader, writer, '/tables', host)
+        writer.close()
+        targets = build_targets(json.loads(body))
+        if not targets:
+            raise RuntimeError("Nenhuma tabela disponível no serviço")
+
+        results = {}
+        for phase in phases:
+            results[phase] = await run_phase(host, port, targets, concurrency, duration,
+                                             uncached=phase == 'uncached')
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço de consulta de KPIs.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help="duração de cada fase (s)")
+    parser.add_argument('--spawn', action='store_true', help="sobe uma instância local antes do teste")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="desliga o cache da instância do --spawn e roda só a fase uncached")
+    args = parser.parse_args()
+
+    phases = ['uncached'] if args.no_cache else PHASES
+    results = asyncio.run(run_load_test(args.host, args.port, args.concurrency, args.duration,
+                                        args.spawn, cache=not args.no_cache, phases=phases))
+
+    for phase, result in results.items():
+        print(f"\n===== Teste de carga ({phase}) =====")
+        print(f"Requisições: {result['requests']} | Erros: {result['errors']}")
+        print(f"Throughput: {result['throughput_rps']:.0f} req/s")
+        print(f"Latência (ms): p50={result['p50_ms']:.2f} | p90={result['p90_ms']:.2f} "
+              f"| p99={result['p99_ms']:.2f} | max={result['max_ms']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
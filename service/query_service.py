@@ -0,0 +1,374 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+from collections import deque, OrderedDict
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+from config.paths import TABLES_DIR
+
+# Coluna temporal usada em filtros de intervalo (start/end)
+TIME_COL = 'year_month'
+
+# Agregações aceitas em agg=col:func
+AGG_FUNCS = {'sum', 'mean', 'min', 'max', 'count', 'median'}
+
+# Alvo de latência p99 (ms) reportado em /stats
+P99_TARGET_MS = 5.0
+
+
+def load_table(csv_path):
+    """
+    Carrega um CSV de agregados e monta os índices em memória:
+    - eq_index: {coluna texto: {valor: posições ordenadas}} para filtros de igualdade
+    - time_order/time_values: ordenação pela coluna temporal para filtros de intervalo
+    """
+    df = pd.read_csv(csv_path)
+    if TIME_COL in df.columns:
+        df[TIME_COL] = pd.to_datetime(df[TIME_COL], errors='coerce')
+
+    eq_index = {}
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            codes, uniques = pd.factorize(df[col])
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            eq_index[col] = {
+                str(value): order[bounds[i]:bounds[i + 1]]
+                for i, value in enumerate(uniques)
+            }
+
+    table = {'df': df, 'eq_index': eq_index, 'time_order': None, 'time_values': None}
+    if TIME_COL in df.columns:
+        time_order = np.argsort(df[TIME_COL].to_numpy(), kind='stable')
+        table['time_order'] = time_order
+        table['time_values'] = df[TIME_COL].to_numpy()[time_order]
+
+    return table
+
+
+class QueryStore:
+    """
+    Mantém em memória as tabelas de TABLES_DIR (kpis_*, series_mensais*, indicators_ci)
+    e responde consultas de filtro / group-by / intervalo de tempo.
+    refresh() recarrega apenas os arquivos alterados desde a última leitura.
+    """
+
+    def __init__(self, tables_dir=TABLES_DIR):
+        self.tables_dir = tables_dir
+        self.tables = {}
+        self.versions = {}
+        self.generation = 0
+        self.refresh()
+
+    def refresh(self):
+        """Recarrega tabelas novas/alteradas e remove as apagadas. Retorna os nomes recarregados."""
+        seen, reloaded = set(), []
+        for filename in sorted(os.listdir(self.tables_dir)):
+            if not filename.endswith('.csv'):
+                continue
+            name = filename[:-4]
+            path = os.path.join(self.tables_dir, filename)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            seen.add(name)
+            version = (st.st_mtime_ns, st.st_size)
+            if self.versions.get(name) == version:
+                continue
+            try:
+                table = load_table(path)
+            except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+                # Arquivo ainda sendo escrito: mantém a versão anterior
+                print(f"⚠️ Falha ao recarregar {filename}: {e}")
+                continue
+            self.tables[name] = table
+            self.versions[name] = version
+            reloaded.append(name)
+
+        removed = set(self.tables) - seen
+        for name in removed:
+            del self.tables[name]
+            del self.versions[name]
+
+        if reloaded or removed:
+            self.generation += 1
+
+        return reloaded
+
+    def describe(self):
+        """Lista tabelas com colunas e número de linhas."""
+        return {
+            name: {'rows': len(t['df']), 'columns': list(t['df'].columns)}
+            for name, t in self.tables.items()
+        }
+
+    def query(self, table, filters=None, group_by=None, agg=None,
+              start=None, end=None, columns=None, limit=None):
+        """
+        Consulta uma tabela:
+        - filters: {coluna: valor ou lista de valores} (igualdade; valores repetidos contam uma vez)
+        - start/end: intervalo inclusivo sobre year_month
+        - group_by: lista de colunas; agg: {coluna: função} (sum, mean, min, max, count, median)
+        - columns: colunas retornadas; limit: máximo de linhas
+        Retorna um DataFrame.
+        """
+        if table not in self.tables:
+            raise KeyError(f"Tabela não encontrada: {table}")
+        t = self.tables[table]
+        df = t['df']
+
+        positions = None
+        if start is not None or end is not None:
+            if t['time_order'] is None:
+                raise ValueError(f"Tabela {table} não possui coluna {TIME_COL}")
+            values = t['time_values']
+            lo = 0 if start is None else np.searchsorted(values, np.datetime64(pd.Timestamp(start)), 'left')
+            hi = len(values) if end is None else np.searchsorted(values, np.datetime64(pd.Timestamp(end)), 'right')
+            positions = np.sort(t['time_order'][lo:hi])
+
+        for col, wanted in (filters or {}).items():
+            if col not in df.columns:
+                raise ValueError(f"Coluna não encontrada: {col}")
+            wanted = wanted if isinstance(wanted, (list, tuple)) else [wanted]
+            if col == TIME_COL:
+                # Igualdade em year_month usa a mesma ordenação dos filtros start/end
+                values = t['time_values']
+                parts = []
+                for v in wanted:
+                    moment = np.datetime64(pd.Timestamp(v))
+                    lo, hi = np.searchsorted(values, moment, 'left'), np.searchsorted(values, moment, 'right')
+                    parts.append(t['time_order'][lo:hi])
+                match = np.unique(np.concatenate(parts))
+            elif col in t['eq_index']:
+                parts = [t['eq_index'][col].get(str(v), np.empty(0, dtype=np.intp)) for v in wanted]
+                match = np.unique(np.concatenate(parts))
+            else:
+                target = pd.to_numeric(pd.Series(wanted), errors='coerce').to_numpy()
+                match = np.flatnonzero(np.isin(df[col].to_numpy(), target))
+            positions = match if positions is None else np.intersect1d(positions, match, assume_unique=True)
+
+        result = df if positions is None else df.iloc[positions]
+
+        if group_by:
+            missing = [c for c in group_by if c not in df.columns]
+            if missing:
+                raise ValueError(f"Colunas não encontradas: {missing}")
+            if not agg:
+                agg = {c: 'sum' for c in result.columns
+                       if c not in group_by and pd.api.types.is_numeric_dtype(result[c])}
+            for col, func in agg.items():
+                if func not in AGG_FUNCS:
+                    raise ValueError(f"Agregação inválida: {func}")
+                if col not in df.columns:
+                    raise ValueError(f"Coluna não encontrada: {col}")
+            result = result.groupby(group_by, sort=True).agg(agg).reset_index()
+
+        if columns:
+            missing = [c for c in columns if c not in result.columns]
+            if missing:
+                raise ValueError(f"Colunas não encontradas: {missing}")
+            result = result[columns]
+        if limit is not None:
+            result = result.head(limit)
+
+        return result
+
+
+def to_records(df):
+    """Converte o DataFrame em lista de dicts serializável em JSON (NaN -> None)."""
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.strftime('%Y-%m-%d')
+        values = series.tolist()
+        if series.hasnans:
+            values = [None if pd.isna(v) else v for v in values]
+        columns[col] = values
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def parse_query_params(params):
+    """
+    Converte a query string HTTP em argumentos de QueryStore.query.
+    Parâmetros reservados: table, group_by, agg (col:func), start, end, columns, limit.
+    Os demais viram filtros de igualdade (valores separados por vírgula ou repetidos).
+    """
+    reserved = {'table', 'group_by', 'agg', 'start', 'end', 'columns', 'limit'}
+    args = {'table': params.get('table', [None])[0], 'filters': {}}
+
+    for key, values in params.items():
+        if key in reserved:
+            continue
+        args['filters'][key] = [v for value in values for v in value.split(',')]
+
+    if 'group_by' in params:
+        args['group_by'] = params['group_by'][0].split(',')
+    if 'agg' in params:
+        args['agg'] = dict(item.split(':', 1) for item in params['agg'][0].split(','))
+    if 'columns' in params:
+        args['columns'] = params['columns'][0].split(',')
+    for key in ['start', 'end']:
+        if key in params:
+            args[key] = params[key][0]
+    if 'limit' in params:
+        args['limit'] = int(params['limit'][0])
+
+    return args
+
+
+class QueryServer:
+    """
+    Servidor HTTP/1.1 mínimo (asyncio, keep-alive) sobre um QueryStore.
+    Rotas: GET /query, GET /tables, GET /stats, GET /health.
+    Respostas de /query ficam em cache até a próxima recarga de tabelas.
+    """
+
+    def __init__(self, store, reload_interval=2.0, latency_window=10_000, cache_size=1024):
+        self.store = store
+        self.reload_interval = reload_interval
+        self.latencies = deque(maxlen=latency_window)
+        self.requests = 0
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_generation = store.generation
+
+    def respond(self, method, target):
+        """Retorna (status, corpo JSON em bytes), usando o cache para /query."""
+        if self.cache_generation != self.store.generation:
+            self.cache.clear()
+            self.cache_generation = self.store.generation
+
+        cacheable = method == 'GET' and target.startswith('/query')
+        if cacheable and target in self.cache:
+            self.cache.move_to_end(target)
+            return self.cache[target]
+
+        status, payload = self.handle(method, target)
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+
+        if cacheable and status == 200:
+            self.cache[target] = (status, body)
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        return status, body
+
+    def handle(self, method, target):
+        """Processa uma requisição e retorna (status, payload)."""
+        if method != 'GET':
+            return 405, {'error': 'Método não suportado'}
+
+        url = urlsplit(target)
+        if url.path == '/health':
+            return 200, {'status': 'ok', 'tables': len(self.store.tables)}
+        if url.path == '/tables':
+            return 200, self.store.describe()
+        if url.path == '/stats':
+            return 200, self.stats()
+        if url.path != '/query':
+            return 404, {'error': f"Rota não encontrada: {url.path}"}
+
+        try:
+            args = parse_query_params(parse_qs(url.query))
+            result = self.store.query(**args)
+        except KeyError as e:
+            return 404, {'error': str(e.args[0])}
+        except (ValueError, TypeError) as e:
+            return 400, {'error': str(e)}
+
+        return 200, {'rows': len(result), 'data': to_records(result)}
+
+    def stats(self):
+        """Percentis de latência (ms) das últimas requisições de /query."""
+        if not self.latencies:
+            return {'requests': self.requests}
+        lat = np.fromiter(self.latencies, dtype=float)
+        p50, p90, p99 = np.percentile(lat, [50, 90, 99])
+        return {
+            'requests': self.requests,
+            'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99, 'max_ms': lat.max(),
+            'p99_target_ms': P99_TARGET_MS, 'p99_within_target': bool(p99 <= P99_TARGET_MS),
+        }
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+
+                start = time.perf_counter()
+                status, body = self.respond(method, target)
+                if target.startswith('/query'):
+                    self.requests += 1
+                    self.latencies.append((time.perf_counter() - start) * 1000)
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def watch(self):
+        """Verifica periodicamente TABLES_DIR e recarrega só as tabelas publicadas de novo."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            reloaded = self.store.refresh()
+            if reloaded:
+                print(f"🔄 Tabelas recarregadas: {', '.join(reloaded)}")
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """Inicia o servidor e a tarefa de hot-reload. Retorna o asyncio.Server."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if self.reload_interval:
+            self._watcher = asyncio.create_task(self.watch())
+        return server
+
+
+async def serve(host='127.0.0.1', port=8765, tables_dir=TABLES_DIR, reload_interval=2.0):
+    store = QueryStore(tables_dir)
+    server = await QueryServer(store, reload_interval).start(host, port)
+    print(f"🚀 Query service em http://{host}:{port} ({len(store.tables)} tabelas)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local de consulta dos agregados de KPIs.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--tables-dir', default=TABLES_DIR)
+    parser.add_argument('--reload-interval', type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.tables_dir, args.reload_interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -275,6 +275,9 @@ LEFT JOIN dim_products dp
 
  
 
+-- Checagens manuais abaixo: no pipeline Python são cobertas pelas regras
+-- de data/quality.py (relatório em outputs/tables/data_quality_report.json).
+
 -- Ver negativos nos tempos
 SELECT 
     COUNT(*) AS total,
@@ -0,0 +1,173 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from scipy import stats
+from config.paths import TABLES_DIR
+
+# Alvos disponíveis: volume (quantity, via enrich_orders) e receita (total)
+TARGETS = {'volume': 'quantity', 'revenue': 'total'}
+
+
+def segment_codes(df, segment_cols):
+    """
+    Codifica as combinações de segment_cols em inteiros 0..G-1.
+    Retorna (códigos por linha, DataFrame com os valores de cada segmento).
+    """
+    grouped = df.groupby(segment_cols, sort=True, observed=True)
+    codes = grouped.ngroup().to_numpy()
+    segments = grouped.size().index.to_frame(index=False)
+    return codes, segments
+
+
+def batched_ols(x, y, codes, n_groups, confidence=0.95):
+    """
+    Ajusta y = a + b*x em todos os grupos de uma vez:
+    os produtos cruzados por grupo são acumulados com bincount sobre x e y
+    centrados na média do grupo, e o sistema 2x2 é resolvido em lote pela
+    forma fechada da inversa (estável mesmo com y em escala de milhões).
+    Grupos com menos de 3 observações ou x constante ficam com NaN.
+    Retorna DataFrame com n, coeficientes, erros padrão, IC do slope e R².
+    """
+    def gsum(w):
+        return np.bincount(codes, weights=w, minlength=n_groups)
+
+    n = np.bincount(codes, minlength=n_groups).astype(float)
+    n_safe = np.where(n > 0, n, 1.0)
+    mean_x, mean_y = gsum(x) / n_safe, gsum(y) / n_safe
+
+    xc, yc = x - mean_x[codes], y - mean_y[codes]
+    sxx, sxy, syy = gsum(xc * xc), gsum(xc * yc), gsum(yc * yc)
+
+    valid = (n >= 3) & (sxx > 1e-12 * (sxx + n * mean_x * mean_x))
+
+    dof = n - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Inversa de X'X em forma fechada: var(b) = s²/Sxx, var(a) = s²(1/n + x̄²/Sxx)
+        slope = sxy / sxx
+        intercept = mean_y - slope * mean_x
+        rss = syy - slope * sxy
+        sigma2 = np.maximum(rss, 0.0) / dof
+        r2 = 1.0 - rss / syy
+        se_slope = np.sqrt(sigma2 / sxx)
+        se_intercept = np.sqrt(sigma2 * (1.0 / n + mean_x * mean_x / sxx))
+    h = se_slope * stats.t.ppf((1 + confidence) / 2., np.maximum(dof, 1))
+
+    result = pd.DataFrame({
+        'n': n.astype(int),
+        'intercept': intercept,
+        'slope': slope,
+        'se_intercept': se_intercept,
+        'se_slope': se_slope,
+        'slope_lower': slope - h,
+        'slope_upper': slope + h,
+        'r2': r2,
+        'mean_x': mean_x,
+        'mean_y': mean_y,
+    })
+    result.loc[~valid, result.columns.drop(['n', 'mean_x', 'mean_y'])] = np.nan
+    return result
+
+
+def fit_elasticity(df, segment_cols, target='volume', model='loglog', by_month=False, confidence=0.95):
+    """
+    Estima a elasticidade de volume/receita em relação ao desconto (%) por segmento.
+    - target: 'volume' (quantity) ou 'revenue' (total)
+    - model: 'loglog' (log y ~ log discount; slope = elasticidade)
+             ou 'ols' (y ~ discount; elasticidade avaliada nas médias)
+    - by_month: adiciona year_month aos segmentos
+    Retorna DataFrame com coeficientes, erros padrão e IC por segmento.
+    """
+    if target not in TARGETS:
+        raise ValueError(f"target deve ser um de {list(TARGETS)}")
+    if model not in ('loglog', 'ols'):
+        raise ValueError("model deve ser 'loglog' ou 'ols'")
+
+    y_col = TARGETS[target]
+    required = list(segment_cols) + ['discount', y_col] + (['order_date'] if by_month else [])
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas ausentes: {missing}")
+
+    data = df[list(segment_cols)].copy()
+    if by_month:
+        data['year_month'] = df['order_date'].dt.to_period('M').astype(str)
+    x = pd.to_numeric(df['discount'], errors='coerce').to_numpy(float)
+    y = pd.to_numeric(df[y_col], errors='coerce').to_numpy(float)
+
+    if model == 'loglog':
+        keep = (x > 0) & (y > 0)
+        x, y = np.log(np.where(keep, x, 1.0)), np.log(np.where(keep, y, 1.0))
+    else:
+        keep = np.isfinite(x) & np.isfinite(y)
+    keep &= data.notna().all(axis=1).to_numpy()
+
+    codes, segments = segment_codes(data[keep], list(data.columns))
+    fit = batched_ols(x[keep], y[keep], codes, len(segments), confidence)
+
+    if model == 'loglog':
+        fit['elasticity'] = fit['slope']
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fit['elasticity'] = fit['slope'] * fit['mean_x'] / fit['mean_y']
+
+    result = pd.concat([segments, fit.drop(columns=['mean_x', 'mean_y'])], axis=1)
+    result.insert(len(segments.columns), 'target', target)
+    result.insert(len(segments.columns) + 1, 'model', model)
+    return result
+
+
+def compute_elasticities(df, group_cols=('category', 'subcategory'), targets=('volume', 'revenue'),
+                         model='loglog', by_month=False):
+    """
+    Roda fit_elasticity para cada coluna de agrupamento e alvo disponível,
+    salva elasticidade_{group_col}.csv em TABLES_DIR e retorna {group_col: csv_path}.
+    """
+    result_paths = {}
+
+    for col in group_cols:
+        if col not in df.columns:
+            print(f"⚠️ Coluna {col} ausente")
+            continue
+
+        tables = []
+        for target in targets:
+            if TARGETS[target] not in df.columns:
+                print(f"⚠️ Coluna {TARGETS[target]} ausente, alvo {target} ignorado")
+                continue
+            tables.append(fit_elasticity(df, [col], target, model, by_month))
+        if not tables:
+            continue
+
+        suffix = f"{col}_mensal" if by_month else col
+        path = os.path.join(TABLES_DIR, f"elasticidade_{suffix}.csv")
+        pd.concat(tables, ignore_index=True).to_csv(path, index=False)
+        result_paths[col] = path
+
+    return result_paths
+
+
+def benchmark_elasticity(n_rows=1_000_000, n_segments=500, repeats=3, seed=42):
+    """
+    Mede o tempo do ajuste em lote para n_segments segmentos sintéticos.
+    Retorna (melhor tempo em s, DataFrame com os coeficientes).
+    """
+    rng = np.random.default_rng(seed)
+    discount = rng.uniform(0.01, 0.15, n_rows)
+    segment = rng.integers(0, n_segments, n_rows)
+    elasticity = rng.normal(-0.5, 0.2, n_segments)
+    quantity = np.exp(1.0 + elasticity[segment] * np.log(discount) + rng.normal(0, 0.3, n_rows))
+    df = pd.DataFrame({'segment': segment, 'discount': discount, 'quantity': quantity})
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fit_elasticity(df, ['segment'])
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    for n_segments in [100, 500, 2000]:
+        best, _ = benchmark_elasticity(n_rows=200_000, n_segments=n_segments)
+        print(f"{n_segments} segmentos: {best*1000:.1f} ms")
@@ -1,7 +1,9 @@
+import os
 import pandas as pd
 import numpy as np
 from scipy import stats
 import matplotlib.pyplot as plt
+from config.paths import TABLES_DIR
 
 def confidence_interval(series, confidence=0.95):
     """
@@ -18,6 +20,10 @@ def confidence_interval(series, confidence=0.95):
     return mean, mean - h, mean + h
 
 def compute_indicators_ci(df):
+    """
+    Calcula IC 95% para médias (ticket, lead time) e proporções (cancelamentos, atrasos).
+    Salva a tabela em TABLES_DIR/indicators_ci.csv e retorna o DataFrame.
+    """
     mean_cols = ['product_price', 'delivery_lead_time']
     
     print("Intervalos de Confiança (95%):\n")
@@ -87,4 +93,16 @@ def compute_indicators_ci(df):
     plt.ylabel("Percentual (%)")
     plt.ylim(0, max(prop_uppers)*1.1)
     plt.tight_layout()
-    plt.close()
\ No newline at end of file
+    plt.close()
+
+    # Tabela consolidada
+    ci_table = pd.DataFrame({
+        'indicator': names + prop_names,
+        'kind': ['mean'] * len(names) + ['proportion'] * len(prop_names),
+        'value': means + prop_means,
+        'lower': lowers + prop_lowers,
+        'upper': uppers + prop_uppers,
+    })
+    ci_table.to_csv(os.path.join(TABLES_DIR, "indicators_ci.csv"), index=False)
+
+    return ci_table
\ No newline at end of file
@@ -0,0 +1,92 @@
+import os
+import time
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+import data.columnar_store as cs
+import data.load_data as ld
+
+
+@pytest.fixture
+def processed_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cs, 'PROCESSED_DIR', str(tmp_path))
+    monkeypatch.setattr(ld, 'PROCESSED_DIR', str(tmp_path))
+    os.makedirs(tmp_path / "orders")
+    pd.DataFrame({
+        'order_id': [1, 2, 3],
+        'order_date': ['2025-01-01', '2025-01-02', None],
+        'category': ['a', 'b', None],
+        'total': [10.0, 20.0, 30.0],
+    }).to_csv(tmp_path / "orders" / "orders.csv", index=False)
+    return tmp_path
+
+
+def test_round_trip_is_memory_mapped(processed_dir):
+    df = cs.load_orders(name="orders")
+    assert df['total'].tolist() == [10.0, 20.0, 30.0]
+    assert df['category'].isna().tolist() == [False, False, True]
+    assert pd.isna(df['order_date'].iloc[2])
+
+    arrays = cs.open_columns("orders", ['total'])
+    assert isinstance(arrays['total'], np.memmap)
+
+
+def test_rewrite_publishes_new_version(processed_dir):
+    cs.load_orders(name="orders")
+    first = cs.current_version_dir("orders")
+    cs.write_columnar(pd.DataFrame({'total': [1.0]}), "orders")
+    second = cs.current_version_dir("orders")
+
+    assert first != second
+    assert cs.read_columnar("orders")['total'].tolist() == [1.0]
+
+
+def test_load_without_csv_uses_existing_store(processed_dir):
+    cs.load_orders(name="orders")
+    os.remove(processed_dir / "orders" / "orders.csv")
+    assert len(cs.load_orders(name="orders")) == 3
+
+
+def test_load_without_store_and_csv_raises(processed_dir):
+    os.remove(processed_dir / "orders" / "orders.csv")
+    with pytest.raises(FileNotFoundError):
+        cs.load_orders(name="orders")
+
+
+def test_open_retries_when_version_removed(processed_dir, monkeypatch):
+    cs.load_orders(name="orders")
+    current = cs.current_version_dir("orders")
+    resolved = iter([str(processed_dir / "orders" / "columns" / "v0-removed"), current])
+    monkeypatch.setattr(cs, 'current_version_dir', lambda name: next(resolved))
+
+    assert cs.read_columnar("orders")['total'].tolist() == [10.0, 20.0, 30.0]
+
+
+def test_concurrent_read_and_publish(processed_dir):
+    cs.load_orders(name="orders")
+    df = pd.DataFrame({'total': np.arange(500.0), 'category': ['a', 'b'] * 250})
+    deadline = time.time() + 1.5
+    errors, reads = [], []
+
+    def publish():
+        while time.time() < deadline:
+            cs.write_columnar(df, "orders")
+
+    def read():
+        while time.time() < deadline:
+            try:
+                cs.read_columnar("orders", ['total'])
+                reads.append(1)
+            except FileNotFoundError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=publish) for _ in range(3)]
+    threads += [threading.Thread(target=read) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert reads
+    assert errors == []
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from stats.elasticity import batched_ols, fit_elasticity
+
+
+@pytest.fixture
+def orders():
+    rng = np.random.default_rng(0)
+    n = 600
+    segment = np.repeat(['a', 'b', 'c'], n // 3)
+    discount = rng.uniform(0.01, 0.15, n)
+    slope = pd.Series({'a': -0.8, 'b': -0.2, 'c': 0.4})[segment].to_numpy()
+    quantity = np.exp(1.0 + slope * np.log(discount) + rng.normal(0, 0.3, n))
+    total = 1000 - 2000 * discount + rng.normal(0, 50, n)
+    return pd.DataFrame({'segment': segment, 'discount': discount,
+                         'quantity': quantity, 'total': total})
+
+
+def sm_fit(x, y):
+    return sm.OLS(y, sm.add_constant(x)).fit()
+
+
+@pytest.mark.parametrize('model, target', [('loglog', 'volume'), ('ols', 'revenue')])
+def test_matches_statsmodels_per_segment(orders, model, target):
+    result = fit_elasticity(orders, ['segment'], target=target, model=model)
+    y_col = 'quantity' if target == 'volume' else 'total'
+
+    for _, row in result.iterrows():
+        seg = orders[orders['segment'] == row['segment']]
+        x, y = seg['discount'].to_numpy(), seg[y_col].to_numpy()
+        if model == 'loglog':
+            x, y = np.log(x), np.log(y)
+        ref = sm_fit(x, y)
+        low, high = ref.conf_int()[1]
+
+        np.testing.assert_allclose(
+            [row['intercept'], row['slope'], row['se_intercept'], row['se_slope'],
+             row['slope_lower'], row['slope_upper'], row['r2']],
+            [ref.params[0], ref.params[1], ref.bse[0], ref.bse[1], low, high, ref.rsquared],
+            rtol=1e-8,
+        )
+
+
+def test_large_y_matches_statsmodels():
+    rng = np.random.default_rng(1)
+    x = rng.uniform(0, 0.15, 1000)
+    y = 1e7 + 5e5 * x + rng.normal(0, 1e3, 1000)
+    fit = batched_ols(x, y, np.zeros(len(x), dtype=int), 1)
+    ref = sm_fit(x, y)
+
+    np.testing.assert_allclose(fit.loc[0, ['slope', 'se_intercept', 'se_slope']].to_numpy(float),
+                               [ref.params[1], ref.bse[0], ref.bse[1]], rtol=1e-8)
+
+
+def test_small_or_constant_segments_are_nan():
+    x = np.array([0.1, 0.2, 0.1, 0.1, 0.1, 0.1, 0.2, 0.3])
+    y = np.array([1.0, 2.0, 1.0, 2.0, 3.0, 1.0, 2.0, 3.5])
+    codes = np.array([0, 0, 1, 1, 1, 2, 2, 2])
+    fit = batched_ols(x, y, codes, 3)
+
+    assert fit['n'].tolist() == [2, 3, 3]
+    assert fit.loc[[0, 1], ['slope', 'se_slope', 'r2']].isna().all().all()
+    assert fit.loc[2, ['slope', 'se_slope']].notna().all()
+
+
+def test_by_month_requires_order_date(orders):
+    with pytest.raises(ValueError, match='order_date'):
+        fit_elasticity(orders, ['segment'], by_month=True)
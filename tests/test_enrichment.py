@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data.enrichment import build_dimension_index, gather, enrich_orders
+
+
+def dimension(ids):
+    return pd.DataFrame({
+        'Id': ids,
+        'State': [f"S{i}" for i in range(len(ids))],
+        'Quantity': np.arange(len(ids), dtype=float) + 1,
+    })
+
+
+@pytest.mark.parametrize('ids, dense', [
+    ([3, 5, 5, 7], True),
+    ([10**9, 5, 5, 7], False),
+])
+def test_duplicate_ids_keep_first_row(ids, dense):
+    index = build_dimension_index(dimension(ids), {'State': 'state', 'Quantity': 'quantity'})
+    assert (index['positions'] is not None) == dense
+
+    result = gather(index, [5, 7, ids[0]])
+    assert list(result['state']) == ['S1', 'S3', 'S0']
+    assert result['quantity'].tolist() == [2.0, 4.0, 1.0]
+
+
+@pytest.mark.parametrize('ids', [[1, 2, 3], [1, 2, 10**9]])
+def test_missing_and_negative_keys_are_nan(ids):
+    index = build_dimension_index(dimension(ids), {'State': 'state', 'Quantity': 'quantity'})
+    result = gather(index, [-1, 4, 2, 10**10])
+
+    assert pd.isna(result['state']).tolist() == [True, True, False, True]
+    assert np.isnan(result['quantity']).tolist() == [True, True, False, True]
+
+
+def test_enrich_orders_matches_merge():
+    dim = pd.DataFrame({
+        'Id': [4, 1, 2, 3],
+        'City': ['Recife', 'Pelotas', 'Patos', None],
+        'State': ['PE', 'RS', 'PB', 'AC'],
+        'Region': ['Nordeste', 'Sul', 'Nordeste', 'Norte'],
+    })
+    columns = {'City': 'city', 'State': 'state', 'Region': 'region'}
+    orders = pd.DataFrame({'order_id': [3, 1, 9, 2, 1, 4], 'total': np.arange(6.0)})
+
+    indexes = {'customer': build_dimension_index(dim, columns)}
+    enriched = enrich_orders(orders.copy(), indexes)
+    expected = orders.merge(dim.rename(columns=columns), how='left',
+                            left_on='order_id', right_on='Id').drop(columns='Id')
+
+    for col in columns.values():
+        assert enriched[col].astype(object).where(enriched[col].notna(), None).tolist() == \
+            expected[col].astype(object).where(expected[col].notna(), None).tolist()
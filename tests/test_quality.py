@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from data.quality import validate, run_quality_stage
+
+RULES = [
+    {'name': 'total_nao_negativo', 'check': 'range', 'column': 'total', 'min': 0},
+    {'name': 'total_consistente', 'check': 'approx', 'column': 'total',
+     'expr': 'subtotal * (1 - discount) + freight_price', 'tolerance': 0.011},
+]
+
+
+def orders():
+    return pd.DataFrame({
+        'order_id': [1, 2, 3, 4],
+        'subtotal': [100.0, 200.0, 50.0, 10.0],
+        'discount': [0.1, 0.0, 0.2, 0.0],
+        'freight_price': [10.0, 20.0, 5.0, 0.0],
+        'total': [100.0, 220.0, 45.0, -1.0],
+    })
+
+
+def test_rule_skipped_when_expr_column_missing():
+    fails, applied = validate(orders().drop(columns='freight_price'), RULES)
+    assert [r['name'] for r in applied] == ['total_nao_negativo']
+    assert fails[:, 0].tolist() == [False, False, False, True]
+
+
+def test_quarantine_and_gate():
+    clean, report = run_quality_stage(orders(), RULES, max_quarantine_pct=10.0, save=False)
+    assert clean['order_id'].tolist() == [1, 2, 3]
+    assert report['n_quarantined'] == 1
+    assert not report['passed']
+
+
+def test_clean_table_is_not_copied():
+    df = orders().iloc[:3]
+    clean, report = run_quality_stage(df, RULES, save=False)
+    assert clean is df
+    assert report['passed']
+
+
+def test_keep_columns_limits_materialisation():
+    clean, _ = run_quality_stage(orders(), RULES, max_quarantine_pct=50.0, save=False,
+                                 keep_columns=['order_id', 'total'])
+    assert list(clean.columns) == ['order_id', 'total']
+    assert np.all(clean['total'] >= 0)
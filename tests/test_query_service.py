@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+from service.query_service import QueryStore, QueryServer
+
+
+@pytest.fixture
+def store(tmp_path):
+    pd.DataFrame({
+        'year_month': ['2025-02-01', '2025-02-01', '2025-03-01', '2025-03-01'],
+        'region': ['Sul', 'Norte', 'Sul', 'Norte'],
+        'revenue': [10.0, 20.0, 30.0, 40.0],
+        'orders': [1, 2, 3, 4],
+    }).to_csv(tmp_path / "series_mensais_region.csv", index=False)
+    return QueryStore(str(tmp_path))
+
+
+def test_repeated_filter_values_count_once(store):
+    result = store.query('series_mensais_region', filters={'region': ['Sul', 'Sul']})
+    assert len(result) == 2
+
+    grouped = store.query('series_mensais_region', filters={'region': ['Sul', 'Sul']},
+                          group_by=['region'], agg={'revenue': 'sum'})
+    assert grouped['revenue'].tolist() == [40.0]
+
+
+def test_repeated_filter_values_over_http(store):
+    server = QueryServer(store, reload_interval=0)
+    for target in ['/query?table=series_mensais_region&region=Sul,Sul',
+                   '/query?table=series_mensais_region&region=Sul&region=Sul']:
+        status, payload = server.handle('GET', target)
+        assert status == 200
+        assert payload['rows'] == 2
+
+
+def test_year_month_equality_filter(store):
+    result = store.query('series_mensais_region', filters={'year_month': ['2025-03-01']})
+    assert result['revenue'].tolist() == [30.0, 40.0]
+
+
+def test_invalid_columns_and_dates_return_400(store):
+    server = QueryServer(store, reload_interval=0)
+    status, payload = server.handle('GET', '/query?table=series_mensais_region&columns=nope')
+    assert status == 400
+    assert 'nope' in payload['error']
+
+    status, _ = server.handle('GET', '/query?table=series_mensais_region&year_month=abc')
+    assert status == 400